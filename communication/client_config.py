@@ -4,6 +4,8 @@ import json
 from pathlib import Path
 import copy
 
+from system import fast_json
+
 # ========== Paths ==========
 BASE_PATH = Path("/home/user/RP500-Client")
 SOUND_BASE_PATH = BASE_PATH / "sounds"
@@ -166,8 +168,8 @@ def load_client_settings():
     
     if CLIENT_CONFIG_PATH.exists():
         try:
-            with open(CLIENT_CONFIG_PATH, "r") as f:
-                user_config = json.load(f)
+            with open(CLIENT_CONFIG_PATH, "rb") as f:
+                user_config = fast_json.loads(f.read())
             for key, value in user_config.items():
                 if isinstance(settings.get(key), dict) and isinstance(value, dict) and key not in ["_default_config"]:
                     settings[key].update(value)
@@ -213,8 +215,8 @@ def save_client_settings(current_config_dict=None):
     config_to_save = {k: v for k, v in current_config_dict.items() if k != "_default_config"}
     try:
         CLIENT_CONFIG_PATH.parent.mkdir(parents=True, exist_ok=True)
-        with open(CLIENT_CONFIG_PATH, "w") as f:
-            json.dump(config_to_save, f, indent=4)
+        with open(CLIENT_CONFIG_PATH, "wb") as f:
+            f.write(fast_json.dumps(config_to_save, indent=True))
         print(f"[CONFIG INFO] Client settings saved to {CLIENT_CONFIG_PATH}")
     except Exception as e:
         print(f"[CONFIG ERROR] Failed to save client settings: {e}")
@@ -7,4 +7,10 @@ source venv/bin/activate
 cd web_interface
 echo "Starting LAURA Control Center web interface..."
 echo "Access at: http://localhost:7860"
-python app.py
\ No newline at end of file
+# Prefer gunicorn with a single eventlet worker (Socket.IO needs one process
+# without a message queue); fall back to the built-in server
+if python -c "import gunicorn, eventlet" 2>/dev/null; then
+    exec gunicorn -k eventlet -w 1 --worker-connections 1000 -b 0.0.0.0:7860 app:app
+else
+    python app.py
+fi
@@ -10,6 +10,23 @@ from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
 import threading
 import time
+from functools import lru_cache
+
+# Optional: multi-term search with a single pass per message
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+
+@lru_cache(maxsize=32)
+def _build_automaton(terms: tuple):
+    """Build an Aho-Corasick automaton mapping each term to its index, cached per query"""
+    automaton = ahocorasick.Automaton()
+    for index, term in enumerate(terms):
+        automaton.add_word(term, index)
+    automaton.make_automaton()
+    return automaton
 
 
 class ConversationMessage:
@@ -18,6 +35,7 @@ class ConversationMessage:
     def __init__(self, role: str, content: str, timestamp: str, mood: Optional[str] = None):
         self.role = role  # 'user' or 'assistant'
         self.content = content
+        self.content_lower = content.lower()  # Computed once for search
         self.timestamp = timestamp
         self.mood = mood
         self.datetime = self._parse_timestamp(timestamp)
@@ -348,8 +366,18 @@ class ConversationHistoryReader:
         query_lower = query.lower()
         matching_messages = []
         
+        # Multi-word queries match messages containing every term, in any order
+        terms = tuple(dict.fromkeys(query_lower.split()))
+        if len(terms) > 1 and ahocorasick is not None:
+            automaton = _build_automaton(terms)
+            matches = lambda text: len({index for _, index in automaton.iter(text)}) == len(terms)
+        elif len(terms) > 1:
+            matches = lambda text: all(term in text for term in terms)
+        else:
+            matches = lambda text: query_lower in text
+        
         for message in self.messages:
-            if query_lower in message.content.lower():
+            if matches(message.content_lower):
                 display_msg = {
                     'role': message.role,
                     'content': message.get_display_content(),
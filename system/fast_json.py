@@ -0,0 +1,29 @@
+#!/usr/bin/env python3
+
+"""
+JSON encoding and decoding through orjson when it is installed, the json module otherwise.
+"""
+
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+HAVE_ORJSON = orjson is not None
+
+
+def loads(data):
+    """Parse JSON from bytes or str"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps(obj, indent=False, default=None) -> bytes:
+    """Serialize obj to UTF-8 JSON bytes, indented by 2 spaces when indent is set"""
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if indent else 0)
+        return orjson.dumps(obj, default=default, option=option)
+    return json.dumps(obj, indent=2 if indent else None, default=default).encode()
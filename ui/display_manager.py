@@ -61,6 +61,17 @@ class DisplayManager:
         
         self.load_image_directories()
         
+        # Pre-rendered solid-colour frames for states without images
+        state_colors = {
+            'error': (150, 50, 50),
+            'disconnected': (50, 50, 50),
+            'booting': (100, 100, 150)
+        }
+        self._fallback_surfaces = {
+            state: self._make_fallback_surface(color) for state, color in state_colors.items()
+        }
+        self._fallback_default = self._make_fallback_surface((25, 25, 25))
+        
         # Load boot image if provided
         self.boot_img = None
         if boot_img_path:
@@ -99,8 +110,7 @@ class DisplayManager:
                         png_files = list(mood_path.glob('*.png'))
                         if png_files:
                             self.image_cache[state][mood] = [
-                                pygame.transform.scale(pygame.image.load(str(img)), (self.window_size, self.window_size))
-                                for img in png_files
+                                self._load_scaled(img) for img in png_files
                             ]
             else:
                 state_path = Path(directory)
@@ -108,10 +118,25 @@ class DisplayManager:
                     png_files = list(state_path.glob('*.png'))
                     if png_files:
                         self.image_cache[state] = [
-                            pygame.transform.scale(pygame.image.load(str(img)), (self.window_size, self.window_size))
-                            for img in png_files
+                            self._load_scaled(img) for img in png_files
                         ]
 
+    def _load_scaled(self, img_path):
+        """Load an image scaled to the window size"""
+        img = pygame.image.load(str(img_path))
+        img = pygame.transform.scale(img, (self.window_size, self.window_size))
+        # Match the display pixel format once so every blit is a straight copy;
+        # images with transparency keep their alpha so they still blend over the screen
+        if img.get_flags() & pygame.SRCALPHA or img.get_alpha() is not None:
+            return img.convert_alpha()
+        return img.convert()
+
+    def _make_fallback_surface(self, color):
+        """Create a window-sized solid colour surface in display format"""
+        surf = pygame.Surface((self.window_size, self.window_size))
+        surf.fill(color)
+        return surf.convert()
+
     async def update_display(self, state, mood=None, text=None):
         """Update display state immediately"""
         while not self.initialized:
@@ -149,13 +174,7 @@ class DisplayManager:
             else:
                 print(f"Warning: No images for state '{state}', using fallback")
                 # Use a fallback color based on state
-                state_colors = {
-                    'error': (150, 50, 50),
-                    'disconnected': (50, 50, 50),
-                    'booting': (100, 100, 150)
-                }
-                color = state_colors.get(state, (25, 25, 25))
-                self.screen.fill(color)
+                self.screen.blit(self._fallback_surfaces.get(state, self._fallback_default), (0, 0))
                 pygame.display.flip()
                 return
                 
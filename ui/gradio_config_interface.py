@@ -15,6 +15,10 @@ from communication.client_config import (
     VOSK_MODEL_PATHS_AVAILABLE, MOOD_COLORS
 )
 
+# Static mood listing for the Display tab (MOOD_COLORS never changes at runtime)
+_MOOD_HTML = "<br>".join(f"<strong>{mood}</strong>: {config['name']}"
+                         for mood, config in MOOD_COLORS.items())
+
 class RP500ConfigInterface:
     def __init__(self):
         self.load_current_settings()
@@ -288,10 +292,7 @@ def create_interface():
                         )
                 
                 gr.Markdown("### Available Mood Colors")
-                mood_info = gr.HTML(
-                    value="<br>".join([f"<strong>{mood}</strong>: {config['name']}" 
-                                     for mood, config in MOOD_COLORS.items()])
-                )
+                mood_info = gr.HTML(value=_MOOD_HTML)
                 
                 display_save_btn = gr.Button("💾 Save Display Settings", variant="primary")
                 display_status = gr.Textbox(label="Status", interactive=False)
@@ -4,19 +4,34 @@ import asyncio
 import time
 import random
 import io
+import os
 import base64
+import hashlib
+import itertools
+import json
+import mmap
+import shutil
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Optional, Callable
-import pygame
 from PIL import Image
 import numpy as np
 from communication.client_config import get_mood_color_config
 
 
+# Data URL encodings: fast PNG for legacy callers, small WebP for async callers
+ENCODE_FORMATS = {
+    'PNG': ('image/png', {'compress_level': 1}),
+    'WEBP': ('image/webp', {'quality': 80, 'method': 0}),
+}
+
+
 class GradioDisplayManager:
     """
-    Web-compatible version of DisplayManager that renders pygame surfaces 
-    off-screen and converts them to PIL Images for Gradio display.
+    Web-compatible version of DisplayManager that renders frames off-screen
+    and serves them as PIL Images for Gradio display.
     
     Maintains all the functionality of the original DisplayManager while
     providing web-compatible output for the unified Gradio interface.
@@ -32,17 +47,9 @@ class GradioDisplayManager:
             window_size: Size of the display (default: 512x512)
             update_callback: Callback function to notify Gradio of updates
         """
-        print(f"[GradioDisplayManager] Initializing headless pygame...")
-        
-        # Initialize pygame in headless mode
-        import os
-        os.environ['SDL_VIDEODRIVER'] = 'dummy'
-        pygame.init()
+        print(f"[GradioDisplayManager] Initializing {window_size}x{window_size} display...")
         
-        print(f"[GradioDisplayManager] Creating off-screen surface {window_size}x{window_size}")
         self.window_size = window_size
-        self.surface = pygame.Surface((window_size, window_size))
-        print(f"[GradioDisplayManager] Off-screen surface created successfully")
         
         # Display state management
         self.base_path = Path('/home/user/RP500-Client/images/laura')
@@ -58,7 +65,26 @@ class GradioDisplayManager:
         
         # Gradio integration
         self.update_callback = update_callback
+        self._fallback_frames = {}  # RGB colour -> solid PIL frame
         self.last_pil_image = None
+        self._rendered_image = None  # Cached image last_pil_image was rendered from
+        self._frame_id = 0  # Incremented on every rendered frame
+        self._b64_cache = {}  # Format -> (frame id, data URL)
+        self._encode_executor = ThreadPoolExecutor(max_workers=1)
+        self._encode_buffers = threading.local()
+        self._png_paths = {}  # id of source frame -> (frame, PNG file Gradio can serve directly)
+        self._png_dir = None
+        self._png_counter = itertools.count()
+        self._last_idx = {}  # (state, mood) -> index of the image shown last
+        self._resize_skipped = 0  # Loads that were already window-sized
+        
+        # Rendering runs on one worker thread so update_display never blocks the loop.
+        # Only one render is queued at a time; it always draws the newest state.
+        self._render_executor = ThreadPoolExecutor(max_workers=1)
+        self._frame_lock = threading.Lock()
+        self._render_pending = False
+        self._last_render_time = 0.0
+        self.min_render_interval = 1 / 30  # Cap renders at the display refresh rate
         
         # Available moods for speaking state
         self.moods = [
@@ -70,19 +96,19 @@ class GradioDisplayManager:
         
         # State directory mapping
         self.states = {
-            'listening': str(self.base_path / 'listening'),
-            'idle': str(self.base_path / 'idle'),
-            'sleep': str(self.base_path / 'sleep'),
-            'speaking': str(self.base_path / 'speaking'),
-            'thinking': str(self.base_path / 'thinking'),
-            'wake': str(self.base_path / 'wake'),
-            'boot': str(self.base_path / 'boot'),
-            'system': str(self.base_path / 'system'),
-            'tool_use': str(self.base_path / 'tool_use'),
-            'notification': str(self.base_path / 'speaking'),  # Maps to speaking images
-            'code': str(self.base_path / 'code'),
-            'error': str(self.base_path / 'error'),
-            'disconnected': str(self.base_path / 'disconnected'),
+            'listening': self.base_path / 'listening',
+            'idle': self.base_path / 'idle',
+            'sleep': self.base_path / 'sleep',
+            'speaking': self.base_path / 'speaking',
+            'thinking': self.base_path / 'thinking',
+            'wake': self.base_path / 'wake',
+            'boot': self.base_path / 'boot',
+            'system': self.base_path / 'system',
+            'tool_use': self.base_path / 'tool_use',
+            'notification': self.base_path / 'speaking',  # Maps to speaking images
+            'code': self.base_path / 'code',
+            'error': self.base_path / 'error',
+            'disconnected': self.base_path / 'disconnected',
         }
         
         # Load all images into cache
@@ -90,12 +116,10 @@ class GradioDisplayManager:
         
         # Initialize with boot image if available
         if boot_img_path and Path(boot_img_path).exists():
-            try:
-                boot_image = pygame.image.load(boot_img_path)
-                self.current_image = pygame.transform.scale(boot_image, (window_size, window_size))
+            boot_image = self._load_one(boot_img_path)
+            if boot_image is not None:
+                self.current_image = boot_image
                 self._render_current_frame()
-            except Exception as e:
-                print(f"[GradioDisplayManager] Warning: Could not load boot image: {e}")
         
         print(f"[GradioDisplayManager] Initialization complete")
 
@@ -103,9 +127,11 @@ class GradioDisplayManager:
         """Load all available images into cache for fast access"""
         print("Loading image directories...")
         
-        for state_name, state_path in self.states.items():
+        # Collect every (state, mood, file) first so decoding can run in parallel
+        jobs = []
+        mood_dirs = [(mood, self.states['speaking'] / mood) for mood in self.moods]
+        for state_name, state_dir in self.states.items():
             print(f"Checking state: {state_name}")
-            state_dir = Path(state_path)
             
             if not state_dir.exists():
                 print(f"Warning: Directory {state_dir} does not exist")
@@ -115,84 +141,280 @@ class GradioDisplayManager:
             
             # For speaking state, load mood-based subdirectories
             if state_name == 'speaking':
-                for mood in self.moods:
-                    mood_dir = state_dir / mood
+                for mood, mood_dir in mood_dirs:
                     if mood_dir.exists():
-                        mood_images = []
-                        for img_file in mood_dir.glob('*.png'):
-                            try:
-                                img = pygame.image.load(str(img_file))
-                                img = pygame.transform.scale(img, (self.window_size, self.window_size))
-                                mood_images.append(img)
-                            except Exception as e:
-                                print(f"Warning: Could not load {img_file}: {e}")
-                        
-                        if mood_images:
-                            self.image_cache[state_name][mood] = mood_images
-                            print(f"  Loaded {len(mood_images)} images for mood: {mood}")
+                        jobs.extend((state_name, mood, img_file) for img_file in self._list_pngs(mood_dir))
             else:
                 # For other states, load images directly
-                state_images = []
-                for img_file in state_dir.glob('*.png'):
-                    try:
-                        img = pygame.image.load(str(img_file))
-                        img = pygame.transform.scale(img, (self.window_size, self.window_size))
-                        state_images.append(img)
-                    except Exception as e:
-                        print(f"Warning: Could not load {img_file}: {e}")
-                
-                if state_images:
-                    self.image_cache[state_name]['default'] = state_images
-                    print(f"  Loaded {len(state_images)} images for state: {state_name}")
+                jobs.extend((state_name, 'default', img_file) for img_file in self._list_pngs(state_dir))
+        
+        # Reuse the decoded frame cache from a previous boot when no PNG changed
+        sources = self._source_signature(jobs)
+        frames = self._read_frame_cache(sources)
+        if frames is None:
+            frames = self._decode_frames(jobs)
+            self._write_frame_cache(frames, sources)
+        
+        for state_name, mood, frame in frames:
+            self.image_cache[state_name].setdefault(mood, []).append(frame)
+        
+        for state_name, state_images in self.image_cache.items():
+            for mood, images in state_images.items():
+                print(f"  Loaded {len(images)} images for {state_name}/{mood}")
 
-    def _surface_to_pil(self) -> Image.Image:
-        """Convert current pygame surface to PIL Image"""
-        # Convert pygame surface to numpy array
-        surface_array = pygame.surfarray.array3d(self.surface)
+    def _decode_frames(self, jobs):
+        """Decode every (state, mood, file) job in parallel, returns (state, mood, frame) tuples"""
+        self._prefetch_files(img_file for _, _, img_file in jobs)
         
-        # Pygame uses (width, height, 3) format, PIL expects (height, width, 3)
-        surface_array = np.transpose(surface_array, (1, 0, 2))
+        # Decode and scale off the main thread, collect results here
+        self._resize_skipped = 0
+        frames = []
+        seen = {}  # Content digest -> shared frame, identical frames are stored once
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            loaded = executor.map(self._load_one, [img_file for _, _, img_file in jobs])
+            for (state_name, mood, _), img in zip(jobs, loaded):
+                if img is None:
+                    continue
+                # Frames are shared with Gradio by reference, never written after load
+                img.setflags(write=False)
+                digest = hashlib.blake2b(img, digest_size=16).digest()
+                frames.append((state_name, mood, seen.setdefault(digest, img)))
         
-        # Convert to PIL Image
-        pil_image = Image.fromarray(surface_array)
+        if frames:
+            print(f"  {self._resize_skipped} of {len(frames)} images already {self.window_size}px, resize skipped")
+            print(f"  {len(seen)} unique frames out of {len(frames)} loaded ({len(frames) - len(seen)} duplicates shared)")
+        return frames
+
+    def _frame_cache_paths(self):
+        """Paths of the decoded frame data and its index for the current window size"""
+        cache_dir = self.base_path / '.frame_cache'
+        return (cache_dir / f'frames_{self.window_size}.bin',
+                cache_dir / f'frames_{self.window_size}.idx')
+
+    @staticmethod
+    def _source_signature(jobs):
+        """Map each source PNG to its mtime so cache staleness can be detected"""
+        sources = {}
+        for _, _, img_file in jobs:
+            try:
+                sources[str(img_file)] = os.stat(img_file).st_mtime_ns
+            except OSError:
+                pass
+        return sources
+
+    def _read_frame_cache(self, sources):
+        """Map the decoded frame cache into memory, returns None when missing or stale"""
+        bin_path, idx_path = self._frame_cache_paths()
+        try:
+            with open(idx_path, 'r') as f:
+                index = json.load(f)
+            if (index.get('window_size') != self.window_size or index.get('mode') != 'RGBX'
+                    or index.get('sources') != sources):
+                return None
+            with open(bin_path, 'rb') as f:
+                frame_map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+        
+        if len(frame_map) != index.get('size'):
+            frame_map.close()
+            return None
+        if hasattr(frame_map, 'madvise'):
+            frame_map.madvise(mmap.MADV_WILLNEED)
+        
+        # Each frame is a read-only view into the mapping, shared frames share a view
+        frame_size = self.window_size * self.window_size * 4
+        views = {}
+        frames = []
+        for state_name, mood, offset in index['frames']:
+            if offset not in views:
+                views[offset] = np.frombuffer(
+                    frame_map, dtype=np.uint8, count=frame_size, offset=offset
+                ).reshape(self.window_size, self.window_size, 4)
+            frames.append((state_name, mood, views[offset]))
         
-        return pil_image
+        self._frame_map = frame_map  # Keep the mapping alive as long as the views
+        print(f"  Mapped {len(views)} cached frames from {bin_path}")
+        return frames
+
+    def _write_frame_cache(self, frames, sources):
+        """Store decoded frames in one flat file plus a JSON index for the next boot"""
+        if not frames:
+            return
+        bin_path, idx_path = self._frame_cache_paths()
+        try:
+            bin_path.parent.mkdir(parents=True, exist_ok=True)
+            offsets = {}  # id(frame) -> offset, shared frames are written once
+            entries = []
+            tmp_bin = bin_path.with_suffix('.bin.tmp')
+            with open(tmp_bin, 'wb') as f:
+                for state_name, mood, frame in frames:
+                    if id(frame) not in offsets:
+                        offsets[id(frame)] = f.tell()
+                        f.write(frame.tobytes())
+                    entries.append([state_name, mood, offsets[id(frame)]])
+                size = f.tell()
+            
+            tmp_idx = idx_path.with_suffix('.idx.tmp')
+            with open(tmp_idx, 'w') as f:
+                json.dump({'window_size': self.window_size, 'mode': 'RGBX', 'size': size,
+                           'sources': sources, 'frames': entries}, f)
+            
+            # Data first, then the index that makes it valid
+            os.replace(tmp_bin, bin_path)
+            os.replace(tmp_idx, idx_path)
+        except OSError as e:
+            print(f"Warning: Could not write frame cache: {e}")
+
+    @staticmethod
+    def _list_pngs(directory):
+        """List PNG files with one scandir pass (no per-entry stat), sorted for a stable order"""
+        with os.scandir(directory) as entries:
+            return sorted(e.path for e in entries if e.name.endswith('.png') and e.is_file())
+
+    def _load_one(self, img_file):
+        """Load and scale a single image file to an RGBX array, returns None on failure"""
+        try:
+            size = (self.window_size, self.window_size)
+            with Image.open(img_file) as src:
+                has_alpha = 'A' in src.getbands() or 'transparency' in src.info
+                img = src.convert('RGBA' if has_alpha else 'RGB')
+            if img.size != size:
+                img = img.resize(size, Image.BILINEAR)
+            else:
+                with self._frame_lock:
+                    self._resize_skipped += 1
+            if has_alpha:
+                # Composite transparent areas onto a black background
+                frame = Image.new('RGB', size, (0, 0, 0))
+                frame.paste(img, mask=img.getchannel('A'))
+                img = frame
+            # (H, W, 4) RGBX: Pillow wraps 4-byte pixels in place, 3-byte RGB is always copied
+            return np.asarray(img.convert('RGBX'))
+        except Exception as e:
+            print(f"Warning: Could not load {img_file}: {e}")
+            return None
+
+    @staticmethod
+    def _prefetch_files(paths):
+        """Ask the kernel to start reading image files before they are decoded"""
+        if not hasattr(os, 'posix_fadvise'):
+            return
+        for path in paths:
+            try:
+                fd = os.open(path, os.O_RDONLY)
+                try:
+                    os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+                finally:
+                    os.close(fd)
+            except OSError:
+                pass
 
     def _render_current_frame(self):
         """Render the current frame and update Gradio if callback is set"""
-        if self.current_image:
-            # Clear surface and blit current image
-            self.surface.fill((0, 0, 0))  # Black background
-            self.surface.blit(self.current_image, (0, 0))
+        with self._frame_lock:
+            current_image = self.current_image
+        
+        if current_image is not None:
+            # Cached frames are pre-scaled RGBX arrays, frombuffer wraps them without a copy
+            pil_image = Image.frombuffer('RGBX', (self.window_size, self.window_size),
+                                         current_image, 'raw', 'RGBX', 0, 1)
         else:
             # Fallback to solid color based on mood
             color_config = get_mood_color_config(self.current_mood)
             if color_config and 'gradient_colors' in color_config:
                 # Use first color from gradient as solid color
                 color = color_config['gradient_colors'][0]
-                self.surface.fill(color)
             else:
                 # Default fallback color
-                self.surface.fill((100, 100, 100))
+                color = (100, 100, 100)
+            # Flat frames are built once per colour and reused on every render
+            color = tuple(color)
+            pil_image = self._fallback_frames.get(color)
+            if pil_image is None:
+                pil_image = Image.new('RGB', (self.window_size, self.window_size), color)
+                self._fallback_frames[color] = pil_image
         
-        # Convert to PIL and cache
-        self.last_pil_image = self._surface_to_pil()
+        with self._frame_lock:
+            self.last_pil_image = pil_image
+            # Solid colour frames depend on mood, never reuse them
+            self._rendered_image = current_image
+            self._frame_id += 1
         
         # Notify Gradio of update if callback is set
         if self.update_callback:
             try:
-                self.update_callback(self.last_pil_image)
+                self.update_callback(self._to_rgb(pil_image))
             except Exception as e:
                 print(f"[GradioDisplayManager] Warning: Update callback failed: {e}")
 
+    def _request_render(self):
+        """Queue a render of the latest state, collapsing requests made while one is pending"""
+        with self._frame_lock:
+            if self._render_pending:
+                return
+            self._render_pending = True
+        self._render_executor.submit(self._render_latest)
+
+    def _render_latest(self):
+        """Render worker: wait out the rate limit, then draw whatever state is newest"""
+        wait = self._last_render_time + self.min_render_interval - time.monotonic()
+        if wait > 0:
+            time.sleep(wait)
+        with self._frame_lock:
+            self._render_pending = False
+        self._render_current_frame()
+        self._last_render_time = time.monotonic()
+
     def get_current_image(self) -> Optional[Image.Image]:
-        """Get the current display as a PIL Image for Gradio"""
-        return self.last_pil_image
+        """Get the current display as an RGB PIL Image for Gradio"""
+        with self._frame_lock:
+            pil_image = self.last_pil_image
+        return self._to_rgb(pil_image) if pil_image is not None else None
+
+    @staticmethod
+    def _to_rgb(pil_image: Image.Image) -> Image.Image:
+        """RGB copy of an RGBX frame for encoders and consumers that expect RGB"""
+        return pil_image.convert('RGB') if pil_image.mode == 'RGBX' else pil_image
+
+    def get_current_image_path(self) -> Optional[str]:
+        """Get the current display as a PNG file path, written once per unique frame"""
+        with self._frame_lock:
+            pil_image, source = self.last_pil_image, self._rendered_image
+        if pil_image is None:
+            return None
+        
+        # The entry holds the frame itself, so its id can't be reused by another object
+        frame = source if source is not None else pil_image
+        entry = self._png_paths.get(id(frame))
+        if entry is None or entry[0] is not frame:
+            if self._png_dir is None:
+                self._png_dir = tempfile.mkdtemp(prefix='laura_frames_')
+            path = os.path.join(self._png_dir, f'frame_{next(self._png_counter)}.png')
+            self._to_rgb(pil_image).save(path, format='PNG', optimize=True)  # Written once, so favour size
+            entry = self._png_paths[id(frame)] = (frame, path)
+        return entry[1]
 
     def set_update_callback(self, callback: Callable):
         """Set the callback function for notifying Gradio of updates"""
         self.update_callback = callback
 
+    def _pick_image(self, key, images):
+        """Pick a random image from images, never the one picked last time for key"""
+        n = len(images)
+        last = self._last_idx.get(key, -1)
+        if n == 1:
+            i = 0
+        elif 0 <= last < n:
+            # Draw from the n-1 other slots and shift past the last one
+            i = random.randrange(n - 1)
+            if i >= last:
+                i += 1
+        else:
+            i = random.randrange(n)
+        self._last_idx[key] = i
+        return images[i]
+
     async def update_display(self, state: str, mood: Optional[str] = None, text: Optional[str] = None):
         """
         Update the display state and render new frame.
@@ -223,31 +445,32 @@ class GradioDisplayManager:
                     mood_images = state_images[mood]
                     if mood_images:
                         # Avoid repeating the same image
-                        available_images = [img for img in mood_images if img != self.current_image]
-                        if not available_images:
-                            available_images = mood_images
-                        new_image = random.choice(available_images)
+                        new_image = self._pick_image((state, mood), mood_images)
                 
                 # Fallback to default images for the state
-                if not new_image and 'default' in state_images:
+                if new_image is None and 'default' in state_images:
                     default_images = state_images['default']
                     if default_images:
                         # Avoid repeating the same image
-                        available_images = [img for img in default_images if img != self.current_image]
-                        if not available_images:
-                            available_images = default_images
-                        new_image = random.choice(available_images)
+                        new_image = self._pick_image((state, 'default'), default_images)
             
-            # If we have a new image, update display
-            if new_image:
-                self.current_image = new_image
-                self.last_image_change = time.time()
-            else:
+            with self._frame_lock:
+                # Same frame already shown - skip the pixel copy and callback
+                if (new_image is not None and new_image is self.current_image
+                        and new_image is self._rendered_image and self.last_pil_image is not None):
+                    return
+                
+                # If we have a new image, update display
+                if new_image is not None:
+                    self.current_image = new_image
+                    self.last_image_change = time.time()
+            
+            if new_image is None:
                 print(f"Warning: No images for state '{state}', using fallback")
                 # Keep current image or use None for color fallback
             
-            # Render the new frame
-            self._render_current_frame()
+            # Render the new frame (coalesced with any render already queued)
+            self._request_render()
             
         except Exception as e:
             print(f"[GradioDisplayManager] Error updating display: {e}")
@@ -272,12 +495,12 @@ class GradioDisplayManager:
                         available_images = self.image_cache[self.current_state]['default']
                         if len(available_images) > 1:
                             # Get a different image
-                            new_images = [img for img in available_images if img != self.current_image]
-                            if new_images:
-                                self.current_image = random.choice(new_images)
+                            new_image = self._pick_image((self.current_state, 'default'), available_images)
+                            with self._frame_lock:
+                                self.current_image = new_image
                                 self.last_image_change = time.time()
-                                self._render_current_frame()
-                                print(f"[GradioDisplayManager] Rotated background image for {self.current_state}")
+                            self._request_render()
+                            print(f"[GradioDisplayManager] Rotated background image for {self.current_state}")
                 
             except asyncio.CancelledError:
                 print("[GradioDisplayManager] Background rotation cancelled")
@@ -287,18 +510,49 @@ class GradioDisplayManager:
                 await asyncio.sleep(5)  # Wait before retrying
 
     def cleanup(self):
-        """Clean up pygame resources"""
+        """Clean up render and encode threads and the served frame PNGs"""
         try:
-            pygame.quit()
+            self._render_executor.shutdown(wait=True)
+            self._encode_executor.shutdown(wait=True)
+            if self._png_dir is not None:
+                shutil.rmtree(self._png_dir, ignore_errors=True)
+                self._png_dir = None
+                self._png_paths.clear()
             print("[GradioDisplayManager] Cleanup completed")
         except Exception as e:
             print(f"[GradioDisplayManager] Warning during cleanup: {e}")
 
+    def _encode_frame(self, fmt: str = 'PNG') -> str:
+        """Encode the current frame as a data URL, once per frame and format"""
+        with self._frame_lock:
+            pil_image, frame_id = self.last_pil_image, self._frame_id
+        if not pil_image:
+            return ""
+        
+        # Polling clients re-request the same frame, only encode once per frame
+        cached = self._b64_cache.get(fmt)
+        if cached and cached[0] == frame_id:
+            return cached[1]
+        
+        # Reuse one buffer per encoding thread instead of allocating per call
+        buffer = getattr(self._encode_buffers, 'buffer', None)
+        if buffer is None:
+            buffer = self._encode_buffers.buffer = io.BytesIO()
+        buffer.seek(0)
+        buffer.truncate(0)
+        
+        mime_type, save_options = ENCODE_FORMATS[fmt]
+        self._to_rgb(pil_image).save(buffer, format=fmt, **save_options)
+        img_str = base64.b64encode(buffer.getvalue()).decode()
+        data_url = f"data:{mime_type};base64,{img_str}"
+        self._b64_cache[fmt] = (frame_id, data_url)
+        return data_url
+
     def get_base64_image(self) -> str:
         """Get current image as base64 string for web display"""
-        if self.last_pil_image:
-            buffer = io.BytesIO()
-            self.last_pil_image.save(buffer, format='PNG')
-            img_str = base64.b64encode(buffer.getvalue()).decode()
-            return f"data:image/png;base64,{img_str}"
-        return ""
\ No newline at end of file
+        return self._encode_frame('PNG')
+
+    async def get_base64_image_async(self) -> str:
+        """Get current image as a base64 WebP data URL, encoded off the event loop"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._encode_executor, self._encode_frame, 'WEBP')
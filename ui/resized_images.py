@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+
+import os
+import tempfile
+
+from PIL import Image
+
+
+def resized_png_path(img_file, cache_file, size=(300, 300)):
+    """
+    Return the path of an RGB PNG of img_file at size, writing a resized copy to cache_file if needed.
+    Gradio serves a path as-is, so display updates skip both decoding and PNG re-encoding.
+    The copy is reused across runs until the source is modified.
+    Falls back to the decoded image when the resized copy cannot be written.
+    """
+    try:
+        # Prefer the pre-resized copy unless the source changed since it was written
+        if cache_file.stat().st_mtime >= img_file.stat().st_mtime:
+            return str(cache_file)
+    except OSError:
+        pass
+
+    with Image.open(img_file) as src:
+        # Opening only reads the header, so ready-sized sources are never decoded
+        if src.size == size and src.mode == 'RGB':
+            return str(img_file)
+        has_alpha = 'A' in src.getbands() or 'transparency' in src.info
+        img = src.convert('RGBA' if has_alpha else 'RGB')
+
+    if img.size != size:
+        img = img.resize(size, Image.BILINEAR)  # Cheaper than the default filter on the Pi
+    if has_alpha:
+        # Composite transparent areas onto black, as GradioDisplayManager._load_one does
+        frame = Image.new('RGB', size, (0, 0, 0))
+        frame.paste(img, mask=img.getchannel('A'))
+        img = frame
+    try:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        # Write a sibling temp file and swap it in, a crash never leaves a truncated copy
+        fd, tmp_path = tempfile.mkstemp(dir=cache_file.parent, suffix='.png.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                img.save(f, format='PNG', compress_level=1)
+            os.replace(tmp_path, cache_file)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+    except OSError as e:
+        print(f"[resized_images] Could not cache resized {img_file}: {e}")
+        return img
+    return str(cache_file)
@@ -1,17 +1,52 @@
 #!/usr/bin/env python3
 
 import gradio as gr
+import atexit
 import json
+import os
+import shutil
 import time
 import threading
 from pathlib import Path
-from PIL import Image
-import numpy as np
+from PIL import Image, ImageDraw
 import random
+import tempfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 
 # Import configuration
 from communication.client_config import client_settings, load_client_settings, get_mood_color_config
 from system.conversation_history_reader import ConversationHistoryReader
+from ui.resized_images import resized_png_path
+
+# Available moods for speaking state
+_MOODS = (
+    "amused", "annoyed", "caring", "casual", "cheerful", "concerned", 
+    "confused", "curious", "disappointed", "embarrassed", "excited", 
+    "frustrated", "interested", "sassy", "scared", "surprised", 
+    "suspicious", "thoughtful"
+)
+
+# State name -> image subdirectory under the base path
+_STATE_SUBDIRS = {
+    'listening': 'listening',
+    'idle': 'idle',
+    'sleep': 'sleep',
+    'speaking': 'speaking',
+    'thinking': 'thinking',
+    'wake': 'wake',
+    'boot': 'boot',
+    'system': 'system',
+    'tool_use': 'tool_use',
+    'notification': 'speaking',
+    'code': 'code',
+    'error': 'error',
+    'disconnected': 'disconnected',
+}
+
+# Fallback image circle geometry
+_CIRCLE_CENTER = 150
+_CIRCLE_RADIUS = 100
 
 
 class SimpleUnifiedInterface:
@@ -20,6 +55,17 @@ class SimpleUnifiedInterface:
     without complex real-time updates that cause async issues.
     """
     
+    _instance = None
+    _instance_lock = threading.Lock()
+    
+    @classmethod
+    def instance(cls):
+        """Return the shared interface, building its image cache only once per process"""
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls()
+            return cls._instance
+    
     def __init__(self):
         print("[SimpleUnifiedInterface] Initializing...")
         load_client_settings()
@@ -30,7 +76,10 @@ class SimpleUnifiedInterface:
         self.current_state = 'boot'
         self.current_mood = 'casual'
         self.image_cache = {}
+        self._color_image_cache = {}  # mood -> fallback image
+        self._color_dir = None  # Private temp dir for the fallback PNGs, created on first use
         self.base_path = Path('/home/user/RP500-Client/images/laura')
+        self.resized_cache_dir = self.base_path / '.cache_300'  # 300x300 copies of the source PNGs
         
         # Load images into cache
         self.load_image_directories()
@@ -45,67 +94,70 @@ class SimpleUnifiedInterface:
         """Load all available images into cache for fast access"""
         print("[SimpleUnifiedInterface] Loading image directories...")
         
-        # Available moods for speaking state
-        moods = [
-            "amused", "annoyed", "caring", "casual", "cheerful", "concerned", 
-            "confused", "curious", "disappointed", "embarrassed", "excited", 
-            "frustrated", "interested", "sassy", "scared", "surprised", 
-            "suspicious", "thoughtful"
-        ]
+        # One directory listing each for the base and speaking dirs instead of an exists() per dir
+        state_subdirs = self._list_subdirs(self.base_path)
+        mood_subdirs = self._list_subdirs(self.base_path / 'speaking')
         
-        # State directory mapping
-        states = {
-            'listening': str(self.base_path / 'listening'),
-            'idle': str(self.base_path / 'idle'),
-            'sleep': str(self.base_path / 'sleep'),
-            'speaking': str(self.base_path / 'speaking'),
-            'thinking': str(self.base_path / 'thinking'),
-            'wake': str(self.base_path / 'wake'),
-            'boot': str(self.base_path / 'boot'),
-            'system': str(self.base_path / 'system'),
-            'tool_use': str(self.base_path / 'tool_use'),
-            'notification': str(self.base_path / 'speaking'),
-            'code': str(self.base_path / 'code'),
-            'error': str(self.base_path / 'error'),
-            'disconnected': str(self.base_path / 'disconnected'),
-        }
-        
-        for state_name, state_path in states.items():
-            state_dir = Path(state_path)
+        # Collect every (state, mood, file) first so decoding can run in parallel
+        jobs = []
+        for state_name, subdir in _STATE_SUBDIRS.items():
+            state_dir = self.base_path / subdir
             
-            if not state_dir.exists():
+            if subdir not in state_subdirs:
                 continue
                 
             self.image_cache[state_name] = {}
             
             # For speaking state, load mood-based subdirectories
             if state_name == 'speaking':
-                for mood in moods:
-                    mood_dir = state_dir / mood
-                    if mood_dir.exists():
-                        mood_images = []
-                        for img_file in mood_dir.glob('*.png'):
-                            try:
-                                mood_images.append(str(img_file))
-                            except Exception as e:
-                                print(f"Warning: Could not load {img_file}: {e}")
-                        
-                        if mood_images:
-                            self.image_cache[state_name][mood] = mood_images
+                for mood in _MOODS:
+                    if mood in mood_subdirs:
+                        mood_dir = state_dir / mood
+                        jobs.extend((state_name, mood, img_file) for img_file in self._list_pngs(mood_dir))
             else:
                 # For other states, load images directly
-                state_images = []
-                for img_file in state_dir.glob('*.png'):
-                    try:
-                        state_images.append(str(img_file))
-                    except Exception as e:
-                        print(f"Warning: Could not load {img_file}: {e}")
-                
-                if state_images:
-                    self.image_cache[state_name]['default'] = state_images
+                jobs.extend((state_name, 'default', img_file) for img_file in self._list_pngs(state_dir))
+        
+        # PIL's decoder releases the GIL, so a few workers overlap SD card reads and decoding
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            loaded = executor.map(self._load_display_image, [img_file for _, _, img_file in jobs])
+            for (state_name, mood, _), img in zip(jobs, loaded):
+                if img is not None:
+                    self.image_cache[state_name].setdefault(mood, []).append(img)
+        
+        # Shuffle once and rotate through each list, avoiding repeats and per-update RNG calls
+        for state_images in self.image_cache.values():
+            for mood, images in state_images.items():
+                state_images[mood] = deque(random.sample(images, len(images)))
         
         print(f"[SimpleUnifiedInterface] Loaded images for {len(self.image_cache)} states")
     
+    @staticmethod
+    def _list_subdirs(directory):
+        """Names of the subdirectories of directory, empty if it is missing"""
+        try:
+            with os.scandir(directory) as entries:
+                return {e.name for e in entries if e.is_dir()}
+        except OSError:
+            return set()
+    
+    @staticmethod
+    def _list_pngs(directory):
+        """List PNG files without glob pattern matching, sorted for a stable order"""
+        return sorted(p for p in directory.iterdir() if p.suffix.lower() == '.png')
+    
+    def _load_display_image(self, img_file):
+        """Prepare an image once so display updates are just a lookup, None on failure"""
+        try:
+            return self._prepare_display_image(img_file)
+        except Exception as e:
+            print(f"Warning: Could not load {img_file}: {e}")
+            return None
+    
+    def _prepare_display_image(self, img_file):
+        """Return the path of a 300x300 RGB PNG for img_file (or the image if it can't be cached)"""
+        return resized_png_path(img_file, self.resized_cache_dir / img_file.relative_to(self.base_path))
+    
     def get_state_image(self, state, mood='casual'):
         """Get an image for the given state and mood"""
         try:
@@ -116,15 +168,13 @@ class SimpleUnifiedInterface:
                 if state == 'speaking' and mood and mood in state_images:
                     mood_images = state_images[mood]
                     if mood_images:
-                        image_path = random.choice(mood_images)
-                        return Image.open(image_path).resize((300, 300))
+                        return self._next_image(mood_images)
                 
                 # Fallback to default images for the state
                 if 'default' in state_images:
                     default_images = state_images['default']
                     if default_images:
-                        image_path = random.choice(default_images)
-                        return Image.open(image_path).resize((300, 300))
+                        return self._next_image(default_images)
             
             # Fallback to color-based image
             return self.create_color_image(mood)
@@ -133,8 +183,17 @@ class SimpleUnifiedInterface:
             print(f"[SimpleUnifiedInterface] Error loading image for {state}/{mood}: {e}")
             return self.create_color_image(mood)
     
+    @staticmethod
+    def _next_image(images):
+        """Take the next image from a pre-shuffled deque and move it to the back"""
+        images.rotate(-1)  # Single C call, the deque is never empty even with concurrent callers
+        return images[-1]
+    
     def create_color_image(self, mood='casual'):
-        """Create a color-based image when no image files are available"""
+        """Create a color-based image when no image files are available, returns its file path"""
+        if mood in self._color_image_cache:
+            return self._color_image_cache[mood]
+        
         try:
             color_config = get_mood_color_config(mood)
             if color_config and 'gradient_colors' in color_config:
@@ -142,23 +201,35 @@ class SimpleUnifiedInterface:
             else:
                 color = (100, 150, 200)  # Default blue
             
-            # Create a simple colored image
-            img_array = np.full((300, 300, 3), color, dtype=np.uint8)
+            # Palette image: index 0 is the mood colour, index 1 the lighter centre,
+            # one byte per pixel instead of three for both memory and PNG encoding
+            lighter = [min(255, int(c) + 50) for c in color]
+            img = Image.new('P', (300, 300), 0)
+            img.putpalette([int(c) for c in color] + lighter)
             
-            # Add a circle in the center
-            center = 150
-            radius = 100
-            y, x = np.ogrid[:300, :300]
-            mask = (x - center) ** 2 + (y - center) ** 2 <= radius ** 2
-            img_array[mask] = [min(255, c + 50) for c in color]  # Lighter center
+            # Add a lighter circle in the center
+            top_left = _CIRCLE_CENTER - _CIRCLE_RADIUS
+            bottom_right = _CIRCLE_CENTER + _CIRCLE_RADIUS
+            ImageDraw.Draw(img).ellipse((top_left, top_left, bottom_right, bottom_right), fill=1)
             
-            return Image.fromarray(img_array)
+            # Write it out once so Gradio can serve the file instead of re-encoding per update
+            try:
+                if self._color_dir is None:
+                    self._color_dir = tempfile.mkdtemp(prefix='laura_colors_')
+                    atexit.register(shutil.rmtree, self._color_dir, True)
+                color_file = Path(self._color_dir) / f"{mood}.png"
+                img.save(color_file)
+                img = str(color_file)
+            except OSError as e:
+                print(f"[SimpleUnifiedInterface] Could not write color image for {mood}: {e}")
+            
+            self._color_image_cache[mood] = img  # Mood colours are fixed at runtime
+            return img
             
         except Exception as e:
             print(f"[SimpleUnifiedInterface] Error creating color image: {e}")
             # Ultimate fallback
-            img_array = np.full((300, 300, 3), (128, 128, 128), dtype=np.uint8)
-            return Image.fromarray(img_array)
+            return Image.new('L', (300, 300), 128)
     
     def update_display_state(self, state, mood='casual'):
         """Update the current display state and mood"""
@@ -177,7 +248,6 @@ class SimpleUnifiedInterface:
         test_states = ['boot', 'listening', 'thinking', 'speaking', 'idle']
         test_moods = ['casual', 'excited', 'curious', 'thoughtful', 'amused']
         
-        import random
         state = random.choice(test_states)
         mood = random.choice(test_moods) if state == 'speaking' else 'casual'
         
@@ -195,13 +265,14 @@ class SimpleUnifiedInterface:
     
     def get_system_status(self):
         """Get current system status"""
+        settings = dict(client_settings)  # One consistent snapshot
         return {
-            "Server URL": client_settings.get("SERVER_URL", "Unknown"),
-            "Device ID": client_settings.get("DEVICE_ID", "Unknown"),
-            "TTS Mode": client_settings.get("tts_mode", "Unknown"),
-            "TTS Provider": client_settings.get("api_tts_provider", "Unknown"),
-            "VOSK Model": client_settings.get("vosk_model_size", "Unknown"),
-            "Audio Sample Rate": client_settings.get("AUDIO_SAMPLE_RATE", "Unknown"),
+            "Server URL": settings.get("SERVER_URL", "Unknown"),
+            "Device ID": settings.get("DEVICE_ID", "Unknown"),
+            "TTS Mode": settings.get("tts_mode", "Unknown"),
+            "TTS Provider": settings.get("api_tts_provider", "Unknown"),
+            "VOSK Model": settings.get("vosk_model_size", "Unknown"),
+            "Audio Sample Rate": settings.get("AUDIO_SAMPLE_RATE", "Unknown"),
             "Status": "Code Mode Active" if True else "Connected"
         }
     
@@ -246,6 +317,9 @@ class SimpleUnifiedInterface:
         # Store reference to self for use in nested functions
         interface_manager = self
         
+        # Snapshot the settings used to build the layout
+        settings = dict(client_settings)
+        
         # Custom CSS for better appearance
         custom_css = """
         .main-container { max-width: 1200px; margin: 0 auto; }
@@ -308,6 +382,7 @@ class SimpleUnifiedInterface:
                     # Display placeholder
                     display_image = gr.Image(
                         value=self.current_display_image,
+                        type="filepath",
                         height=300,
                         width=300,
                         elem_classes=["display-panel"],
@@ -326,7 +401,7 @@ class SimpleUnifiedInterface:
                     # System Status
                     gr.Markdown("### 📊 System Status")
                     status_display = gr.Textbox(
-                        value=f"Server: {client_settings.get('SERVER_URL', 'Unknown')}\nDevice: {client_settings.get('DEVICE_ID', 'Unknown')}\nTTS: {client_settings.get('tts_mode', 'Unknown')}",
+                        value=f"Server: {settings.get('SERVER_URL', 'Unknown')}\nDevice: {settings.get('DEVICE_ID', 'Unknown')}\nTTS: {settings.get('tts_mode', 'Unknown')}",
                         label="Current Status",
                         interactive=False,
                         max_lines=5,
@@ -338,12 +413,12 @@ class SimpleUnifiedInterface:
                 with gr.Row():
                     with gr.Column():
                         config_server_url = gr.Textbox(
-                            value=client_settings.get("SERVER_URL", ""),
+                            value=settings.get("SERVER_URL", ""),
                             label="Server URL",
                             placeholder="http://174.165.47.128:8765"
                         )
                         config_device_id = gr.Textbox(
-                            value=client_settings.get("DEVICE_ID", ""),
+                            value=settings.get("DEVICE_ID", ""),
                             label="Device ID",
                             placeholder="Pi500-og"
                         )
@@ -351,12 +426,12 @@ class SimpleUnifiedInterface:
                     with gr.Column():
                         config_tts_mode = gr.Dropdown(
                             choices=["api", "local"],
-                            value=client_settings.get("tts_mode", "api"),
+                            value=settings.get("tts_mode", "api"),
                             label="TTS Mode"
                         )
                         config_tts_provider = gr.Dropdown(
                             choices=["elevenlabs", "cartesia"],
-                            value=client_settings.get("api_tts_provider", "elevenlabs"),
+                            value=settings.get("api_tts_provider", "elevenlabs"),
                             label="TTS Provider"
                         )
                 
@@ -420,7 +495,7 @@ class SimpleUnifiedInterface:
 
 def create_simple_interface():
     """Create and return the simplified interface"""
-    interface_manager = SimpleUnifiedInterface()
+    interface_manager = SimpleUnifiedInterface.instance()
     return interface_manager.create_interface()
 
 
@@ -5,9 +5,7 @@ Integration module for connecting the unified Gradio interface with the main RP5
 Provides seamless communication between the client and the web interface.
 """
 
-import asyncio
 import threading
-import time
 from typing import Optional, Dict, Any
 from pathlib import Path
 
@@ -28,6 +26,7 @@ class UnifiedClientBridge:
         self.interface_manager: Optional[SimpleUnifiedInterface] = None
         self.bridge_active = False
         self.sync_thread = None
+        self._stop_event = threading.Event()  # Wakes the sync worker immediately on stop
         
         print("[UnifiedClientBridge] Initialized")
     
@@ -46,6 +45,7 @@ class UnifiedClientBridge:
             return
         
         self.bridge_active = True
+        self._stop_event.clear()
         self.sync_thread = threading.Thread(target=self._sync_worker, daemon=True)
         self.sync_thread.start()
         
@@ -54,6 +54,7 @@ class UnifiedClientBridge:
     def stop_bridge(self):
         """Stop the bridge"""
         self.bridge_active = False
+        self._stop_event.set()
         if self.sync_thread:
             self.sync_thread.join(timeout=2)
         
@@ -73,13 +74,9 @@ class UnifiedClientBridge:
     
     def _sync_worker(self):
         """Background worker for synchronization tasks"""
-        while self.bridge_active:
-            try:
-                # Perform any periodic synchronization tasks here
-                time.sleep(5)
-            except Exception as e:
-                print(f"[UnifiedClientBridge] Sync error: {e}")
-                time.sleep(1)
+        while not self._stop_event.wait(5):
+            # Perform any periodic synchronization tasks here
+            pass
 
 
 class UnifiedPiMCPClient:
@@ -116,30 +113,37 @@ class UnifiedPiMCPClient:
     def _setup_unified_interface(self):
         """Set up the unified Gradio interface"""
         try:
+            # Set once launch returns (or fails) so we wait only as long as startup takes
+            self._iface_ready = threading.Event()
+            
             # Create the unified interface in a separate thread
             def launch_interface():
-                self.unified_interface = SimpleUnifiedInterface()
-                interface = self.unified_interface.create_interface()
-                
-                # Store reference (SimpleUnifiedInterface doesn't need background tasks)
-                interface.interface_manager = self.unified_interface
-                
-                # Launch the interface
-                interface.launch(
-                    server_name="0.0.0.0",
-                    server_port=self.interface_port,
-                    share=False,
-                    debug=False,
-                    show_error=True,
-                    prevent_thread_lock=True,
-                    quiet=True
-                )
+                try:
+                    self.unified_interface = SimpleUnifiedInterface.instance()
+                    interface = self.unified_interface.create_interface()
+                    
+                    # Store reference (SimpleUnifiedInterface doesn't need background tasks)
+                    interface.interface_manager = self.unified_interface
+                    
+                    # Launch the interface
+                    interface.launch(
+                        server_name="0.0.0.0",
+                        server_port=self.interface_port,
+                        share=False,
+                        debug=False,
+                        show_error=True,
+                        prevent_thread_lock=True,
+                        quiet=True
+                    )
+                finally:
+                    self._iface_ready.set()
             
             self.interface_thread = threading.Thread(target=launch_interface, daemon=True)
             self.interface_thread.start()
             
-            # Wait a moment for the interface to start
-            time.sleep(2)
+            # Wait for the interface to start
+            if not self._iface_ready.wait(timeout=10):
+                print("[UnifiedPiMCPClient] Interface still starting after 10s, continuing")
             
             # Set up the bridge
             self.bridge = UnifiedClientBridge()
@@ -176,9 +180,9 @@ class UnifiedPiMCPClient:
             
             async def rotate_background(self):
                 """Background rotation is handled by the unified interface"""
-                # The GradioDisplayManager handles rotation, so this is a no-op
-                while True:
-                    await asyncio.sleep(60)  # Keep the task alive but do nothing
+                # The GradioDisplayManager handles rotation, so this is a no-op.
+                # Returning right away keeps an idle task off the event loop.
+                return
             
             def cleanup(self):
                 pass  # Handled by bridge
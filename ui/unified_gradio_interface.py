@@ -1,15 +1,14 @@
 #!/usr/bin/env python3
 
 import gradio as gr
-import json
 import asyncio
 import threading
 import time
 from pathlib import Path
-from typing import Optional, Dict, Any
-from PIL import Image
+from typing import Optional, Dict, Any, Callable
 
 # Import our custom components
+from system import fast_json
 from ui.gradio_display_manager import GradioDisplayManager
 from system.conversation_history_reader import ConversationHistoryReader
 from communication.client_config import (
@@ -18,6 +17,32 @@ from communication.client_config import (
     VOSK_MODEL_PATHS_AVAILABLE, MOOD_COLORS
 )
 
+# Minimum seconds between conversation snapshot rebuilds from reader callbacks (20 Hz)
+UPDATE_INTERVAL = 0.05
+
+# Search result row: background colour, role label, time, content
+SEARCH_RESULT_TEMPLATE = (
+    '<div style="background: {0}; margin: 10px 0; padding: 10px; border-radius: 5px;">'
+    '<strong>{1}</strong> <small>({2})</small><br>{3}</div>'
+)
+SEARCH_ROLE_STYLES = {
+    'user': ('#e3f2fd', 'You'),
+    'assistant': ('#f1f8e9', 'LAURA'),
+}
+
+# Status panel auto-refresh interval, doubling up to the max while the status is unchanged
+STATUS_POLL_MIN = 0.5
+STATUS_POLL_MAX = 8.0
+
+# Seconds of quiet after a quick-control change before settings are written to disk
+SETTINGS_SAVE_DELAY = 0.5
+
+# Seconds between checks for a new conversation snapshot in each session
+CONVERSATION_POLL_INTERVAL = 1.0
+
+# Number of chat messages rendered at once, "Load earlier" extends by this much
+HISTORY_PAGE_SIZE = 50
+
 
 class UnifiedRP500Interface:
     """
@@ -28,6 +53,8 @@ class UnifiedRP500Interface:
     - Configuration options
     """
     
+    STATS_TEMPLATE = "Today: {} messages ({} user, {} AI)"
+    
     def __init__(self):
         print("[UnifiedRP500Interface] Initializing unified interface...")
         
@@ -36,8 +63,7 @@ class UnifiedRP500Interface:
         
         # Initialize display manager
         self.display_manager = GradioDisplayManager(
-            window_size=client_settings.get("DISPLAY_WINDOW_SIZE", 512),
-            update_callback=self._on_display_update
+            window_size=client_settings.get("DISPLAY_WINDOW_SIZE", 512)
         )
         
         # Initialize conversation history reader
@@ -54,40 +80,116 @@ class UnifiedRP500Interface:
         self.conversation_html = None
         self.status_display = None
         self.message_count_display = None
+        # (history key, chat HTML, statistics text), rebuilt by _refresh_conversation
+        self._conversation_snapshot = None
+        
+        # Bumped on every display state change, see poll_system_status
+        self._state_epoch = 0
+        
+        # Update throttling, keyed by 'conversation'
+        self._throttle_lock = threading.Lock()
+        self._last_update = {}
+        self._pending_args = {}
+        self._throttle_timers = {}
         
         # Background tasks
         self.background_tasks = []
         self.shutdown_event = threading.Event()
         
+        # Debounced settings writes from the quick controls
+        self._save_lock = threading.Lock()
+        self._save_timer = None
+        
+        # One long-lived loop for display updates requested from non-async code
+        self._update_loop = asyncio.new_event_loop()
+        threading.Thread(target=self._update_loop.run_forever, daemon=True).start()
+        
         print("[UnifiedRP500Interface] Initialization complete")
     
-    def _on_display_update(self, pil_image: Image.Image):
-        """Called when display manager updates the image"""
-        try:
-            if self.display_image is not None:
-                # Store the image for the next interface refresh
-                # Note: Gradio Image components update automatically with the interface
-                pass
-        except Exception as e:
-            print(f"[UnifiedRP500Interface] Error updating display: {e}")
+    def _throttle(self, key: str, fn: Callable, *args):
+        """Run fn at most once per UPDATE_INTERVAL for key, deferring the latest call in between"""
+        with self._throttle_lock:
+            if key in self._throttle_timers:
+                # A deferred call is due, it picks up these args instead of running twice
+                self._pending_args[key] = args
+                return
+            now = time.monotonic()
+            wait = self._last_update.get(key, 0.0) + UPDATE_INTERVAL - now
+            if wait > 0:
+                self._pending_args[key] = args
+                timer = threading.Timer(wait, self._flush_throttled, (key, fn))
+                timer.daemon = True
+                self._throttle_timers[key] = timer
+                timer.start()
+                return
+            self._last_update[key] = now
+        fn(*args)
+    
+    def _flush_throttled(self, key: str, fn: Callable):
+        """Timer callback that runs the most recent deferred call for key"""
+        with self._throttle_lock:
+            self._throttle_timers.pop(key, None)
+            args = self._pending_args.pop(key, ())
+            self._last_update[key] = time.monotonic()
+        fn(*args)
+    
+    def _on_dashboard_selected(self):
+        """Tab handler: show the newest frame when this session returns to the dashboard"""
+        return self.display_manager.get_current_image_path()
     
     def _on_conversation_update(self):
         """Called when conversation history is updated"""
+        self._throttle('conversation', self._refresh_conversation)
+    
+    def _refresh_conversation(self):
+        """Re-render the conversation panel and statistics into the shared snapshot"""
         try:
-            if self.conversation_html is not None:
-                # Update conversation display
-                html_content = self.conversation_reader.get_formatted_chat_html()
-                self.conversation_html.update(value=html_content)
-                
-            if self.message_count_display is not None:
-                # Update message count
-                stats = self.conversation_reader.get_today_message_count()
-                stats_text = f"Today: {stats['total_messages']} messages ({stats['user_messages']} user, {stats['assistant_messages']} AI)"
-                self.message_count_display.update(value=stats_text)
-                
+            # Skip the full HTML rebuild when the history hasn't actually changed
+            messages = self.conversation_reader.messages
+            newest = messages[0] if messages else None
+            cache_key = (len(messages), newest.timestamp, newest.content) if newest else (0,)
+            if self._conversation_snapshot is not None and self._conversation_snapshot[0] == cache_key:
+                return
+            
+            html_content = self.conversation_reader.get_formatted_chat_html(limit=HISTORY_PAGE_SIZE)
+            stats = self.conversation_reader.get_today_message_count()
+            stats_text = self.STATS_TEMPLATE.format(
+                stats['total_messages'], stats['user_messages'], stats['assistant_messages']
+            )
+            self._conversation_snapshot = (cache_key, html_content, stats_text)
         except Exception as e:
             print(f"[UnifiedRP500Interface] Error updating conversation: {e}")
     
+    def poll_conversation(self, shown, limit):
+        """Timer handler: send the session the latest conversation snapshot if it hasn't seen it.
+        shown is the per-session key of the history last sent, or "search" while results are up."""
+        snapshot = self._conversation_snapshot
+        if shown == "search" or snapshot is None or snapshot[0] == shown:
+            return gr.update(), gr.update(), shown
+        cache_key, html_content, stats_text = snapshot
+        if limit != HISTORY_PAGE_SIZE:
+            # Expanded history isn't part of the shared snapshot, render this session's page
+            html_content = self.conversation_reader.get_formatted_chat_html(limit=limit)
+        return html_content, stats_text, cache_key
+    
+    def _schedule_settings_save(self):
+        """Save client settings once changes have been quiet for SETTINGS_SAVE_DELAY"""
+        with self._save_lock:
+            if self._save_timer is not None:
+                self._save_timer.cancel()
+            self._save_timer = threading.Timer(SETTINGS_SAVE_DELAY, self._flush_settings_save)
+            self._save_timer.daemon = True
+            self._save_timer.start()
+    
+    def _flush_settings_save(self):
+        """Write pending settings changes to disk, if any"""
+        with self._save_lock:
+            if self._save_timer is None:
+                return
+            self._save_timer.cancel()
+            self._save_timer = None
+        save_client_settings()
+    
     def get_system_status(self) -> Dict[str, str]:
         """Get current system status information"""
         return {
@@ -100,21 +202,42 @@ class UnifiedRP500Interface:
             "server_url": client_settings.get("SERVER_URL", ""),
         }
     
+    def poll_system_status(self, poll):
+        """Timer handler: refresh the status panel and retune the session's timer, doubling
+        its interval while nothing changes. poll is the per-session (interval, last status,
+        state epoch) state."""
+        interval, last_status, epoch = poll or (STATUS_POLL_MIN, None, None)
+        status = self.get_system_status()
+        if status == last_status and epoch == self._state_epoch:
+            # Unchanged: double the interval up to the maximum
+            new_interval = min(interval * 2, STATUS_POLL_MAX)
+            timer = gr.Timer(value=new_interval) if new_interval != interval else gr.update()
+            return gr.update(), timer, (new_interval, last_status, self._state_epoch)
+        
+        # Changed: back to the full rate
+        timer = gr.Timer(value=STATUS_POLL_MIN) if interval != STATUS_POLL_MIN else gr.update()
+        return status, timer, (STATUS_POLL_MIN, status, self._state_epoch)
+    
     def update_display_state(self, state: str, mood: str = "casual"):
         """Update the display state (for external control)"""
         self.current_state = state
         self.current_mood = mood
+        self._state_epoch += 1  # Resets status polling backoff in every session on its next tick
         
         # Update display manager asynchronously
         async def update_async():
             await self.display_manager.update_display(state, mood)
         
-        # Run in background thread if not in async context
         try:
-            asyncio.create_task(update_async())
+            loop = asyncio.get_running_loop()
         except RuntimeError:
-            # If no event loop, run in thread
-            threading.Thread(target=lambda: asyncio.run(update_async())).start()
+            loop = None
+        
+        if loop is not None:
+            loop.create_task(update_async())
+        else:
+            # Not in async context, hand off to the persistent background loop
+            asyncio.run_coroutine_threadsafe(update_async(), self._update_loop)
     
     def create_interface(self):
         """Create the unified Gradio interface"""
@@ -159,7 +282,7 @@ class UnifiedRP500Interface:
             with gr.Tabs() as tabs:
                 
                 # Main Dashboard Tab
-                with gr.Tab("📊 Dashboard", id="dashboard"):
+                with gr.Tab("📊 Dashboard", id="dashboard") as dashboard_tab:
                     
                     with gr.Row():
                         # Left column - Conversation History
@@ -167,16 +290,26 @@ class UnifiedRP500Interface:
                             gr.Markdown("### 💬 Conversation History")
                             
                             # Message count and stats
+                            self._refresh_conversation()
+                            snapshot = self._conversation_snapshot
                             self.message_count_display = gr.Textbox(
                                 label="Statistics",
-                                value="Loading conversation history...",
+                                value=snapshot[2] if snapshot else "Loading conversation history...",
                                 interactive=False,
                                 container=True
                             )
                             
+                            # Only the newest messages are rendered, older ones load on demand
+                            history_limit = gr.State(HISTORY_PAGE_SIZE)
+                            conversation_shown = gr.State(snapshot[0] if snapshot else None)
+                            load_earlier_btn = gr.Button(
+                                "⬆️ Load earlier messages", variant="secondary", size="sm",
+                                visible=HISTORY_PAGE_SIZE < len(self.conversation_reader.messages)
+                            )
+                            
                             # Conversation display
                             self.conversation_html = gr.HTML(
-                                value=self.conversation_reader.get_formatted_chat_html(),
+                                value=snapshot[1] if snapshot else "",
                                 elem_classes=["conversation-panel"]
                             )
                             
@@ -194,7 +327,8 @@ class UnifiedRP500Interface:
                             
                             # Main pygame display
                             self.display_image = gr.Image(
-                                value=self.display_manager.get_current_image(),
+                                value=self.display_manager.get_current_image_path(),
+                                type="filepath",
                                 height=400,
                                 width=400,
                                 elem_classes=["display-panel"],
@@ -252,7 +386,8 @@ class UnifiedRP500Interface:
                                 refresh_btn = gr.Button("🔄 Refresh Status", variant="secondary")
                 
                 # Configuration Tab
-                with gr.Tab("⚙️ Configuration", id="config"):
+                # Configuration and Logs contents are filled in when their tab is first opened
+                with gr.Tab("⚙️ Configuration", id="config") as config_tab:
                     gr.Markdown("### 🔧 Advanced Configuration")
                     gr.Markdown("Detailed system configuration options")
                     
@@ -263,29 +398,24 @@ class UnifiedRP500Interface:
                                 with gr.Column():
                                     server_url = gr.Textbox(
                                         label="Server URL",
-                                        value=client_settings.get("SERVER_URL", ""),
                                         placeholder="http://174.165.47.128:8765"
                                     )
                                     device_id = gr.Textbox(
                                         label="Device ID",
-                                        value=client_settings.get("DEVICE_ID", ""),
                                         placeholder="Pi500-og"
                                     )
                                     sample_rate = gr.Number(
                                         label="Audio Sample Rate",
-                                        value=client_settings.get("AUDIO_SAMPLE_RATE", 16000),
                                         precision=0
                                     )
                                 
                                 with gr.Column():
                                     vosk_model = gr.Dropdown(
                                         label="VOSK Model Size",
-                                        choices=list(VOSK_MODEL_PATHS_AVAILABLE.keys()),
-                                        value=client_settings.get("vosk_model_size", "medium")
+                                        choices=list(VOSK_MODEL_PATHS_AVAILABLE.keys())
                                     )
                                     window_size = gr.Number(
                                         label="Display Window Size",
-                                        value=client_settings.get("DISPLAY_WINDOW_SIZE", 512),
                                         precision=0
                                     )
                             
@@ -298,7 +428,6 @@ class UnifiedRP500Interface:
                             
                             wake_words_text = gr.Textbox(
                                 label="Wake Words Configuration",
-                                value=self._get_current_wake_words(),
                                 lines=8,
                                 placeholder="Laura.pmdl: 0.45\nWake_up_Laura.pmdl: 0.5"
                             )
@@ -318,7 +447,7 @@ class UnifiedRP500Interface:
                             import_status = gr.Textbox(label="Status", interactive=False)
                 
                 # Logs and Monitoring Tab
-                with gr.Tab("📋 Logs", id="logs"):
+                with gr.Tab("📋 Logs", id="logs") as logs_tab:
                     gr.Markdown("### 📋 System Logs and Monitoring")
                     
                     with gr.Row():
@@ -333,12 +462,25 @@ class UnifiedRP500Interface:
                         
                         with gr.Column():
                             gr.Markdown("### Conversation Analytics")
-                            analytics_display = gr.JSON(
-                                value=self.conversation_reader.get_today_message_count(),
-                                label="Today's Statistics"
-                            )
+                            analytics_display = gr.JSON(label="Today's Statistics")
+            
+            config_loaded = gr.State(False)
             
             # Event handlers
+            def load_config_tab(loaded):
+                if loaded:
+                    # Keep any unsaved edits when the tab is reopened
+                    return [gr.update()] * 6 + [True]
+                return [
+                    client_settings.get("SERVER_URL", ""),
+                    client_settings.get("DEVICE_ID", ""),
+                    client_settings.get("AUDIO_SAMPLE_RATE", 16000),
+                    client_settings.get("vosk_model_size", "medium"),
+                    client_settings.get("DISPLAY_WINDOW_SIZE", 512),
+                    self._get_current_wake_words(),
+                    True
+                ]
+            
             def save_basic_config(url, dev_id, rate, vosk_m, win_size):
                 try:
                     client_settings.update({
@@ -359,9 +501,12 @@ class UnifiedRP500Interface:
                     new_tts_mode = "api" if tts_mode_val == "API (Cloud)" else "local"
                     new_tts_provider = "elevenlabs" if tts_prov == "ElevenLabs" else "cartesia"
                     
-                    client_settings["tts_mode"] = new_tts_mode
-                    client_settings["api_tts_provider"] = new_tts_provider
-                    save_client_settings()
+                    # Only touch the settings file when a saved value actually changed
+                    if (client_settings.get("tts_mode") != new_tts_mode
+                            or client_settings.get("api_tts_provider") != new_tts_provider):
+                        client_settings["tts_mode"] = new_tts_mode
+                        client_settings["api_tts_provider"] = new_tts_provider
+                        self._schedule_settings_save()
                     
                     return self.get_system_status()
                 except Exception as e:
@@ -372,58 +517,104 @@ class UnifiedRP500Interface:
                 if query.strip():
                     results = self.conversation_reader.search_messages(query)
                     # Format search results
-                    html_parts = ['<div style="padding: 10px;">']
-                    html_parts.append(f'<h4>Search Results for "{query}" ({len(results)} found)</h4>')
-                    
-                    for msg in results:
-                        role_label = "You" if msg['role'] == 'user' else "LAURA"
-                        bg_color = "#e3f2fd" if msg['role'] == 'user' else "#f1f8e9"
-                        
-                        html_parts.append(f'''
-                        <div style="background: {bg_color}; margin: 10px 0; padding: 10px; border-radius: 5px;">
-                            <strong>{role_label}</strong> <small>({msg['time']})</small><br>
-                            {msg['content']}
-                        </div>
-                        ''')
-                    
-                    html_parts.append('</div>')
-                    return ''.join(html_parts)
+                    header = f'<div style="padding: 10px;"><h4>Search Results for "{query}" ({len(results)} found)</h4>'
+                    body = ''.join(
+                        SEARCH_RESULT_TEMPLATE.format(
+                            *SEARCH_ROLE_STYLES.get(msg['role'], SEARCH_ROLE_STYLES['assistant']),
+                            msg['time'], msg['content']
+                        )
+                        for msg in results
+                    )
+                    # Paging only applies to the chat view, start over when it's shown again;
+                    # the conversation timer leaves the results alone until the search is cleared
+                    return header + body + '</div>', HISTORY_PAGE_SIZE, gr.update(visible=False), "search"
                 else:
-                    return self.conversation_reader.get_formatted_chat_html()
+                    return (
+                        self.conversation_reader.get_formatted_chat_html(limit=HISTORY_PAGE_SIZE),
+                        HISTORY_PAGE_SIZE,
+                        gr.update(visible=has_earlier(HISTORY_PAGE_SIZE)),
+                        None  # Resent on the next tick
+                    )
+            
+            def has_earlier(limit):
+                # The reader only keeps its newest max_messages, nothing beyond those to load
+                return limit < len(self.conversation_reader.messages)
+            
+            def load_earlier_messages(limit):
+                limit = min(limit + HISTORY_PAGE_SIZE, len(self.conversation_reader.messages))
+                html = self.conversation_reader.get_formatted_chat_html(limit=limit)
+                return html, limit, gr.update(visible=has_earlier(limit))
             
             def export_config():
                 try:
-                    config_json = json.dumps(client_settings, indent=2, default=str)
+                    config_json = fast_json.dumps(client_settings, indent=True, default=str).decode()
                     return config_json, "✅ Configuration exported successfully!"
                 except Exception as e:
                     return "", f"❌ Error exporting config: {str(e)}"
             
             # Wire up event handlers
+            config_tab.select(
+                load_config_tab,
+                inputs=config_loaded,
+                outputs=[server_url, device_id, sample_rate, vosk_model, window_size, wake_words_text, config_loaded]
+            )
+            
+            logs_tab.select(
+                self.conversation_reader.get_today_message_count,
+                outputs=analytics_display
+            )
+            
+            # Catch the display up with frames rendered while another tab was open
+            dashboard_tab.select(self._on_dashboard_selected, outputs=self.display_image)
+            
             config_save_btn.click(
                 save_basic_config,
                 inputs=[server_url, device_id, sample_rate, vosk_model, window_size],
                 outputs=config_status
             )
             
-            # Quick controls auto-update
-            for component in [llm_provider, voice_persona, tts_mode, tts_provider]:
-                component.change(
-                    update_quick_controls,
-                    inputs=[llm_provider, voice_persona, tts_mode, tts_provider],
-                    outputs=self.status_display
-                )
+            # Quick controls auto-update, one listener shared by all four controls
+            gr.on(
+                triggers=[llm_provider.change, voice_persona.change, tts_mode.change, tts_provider.change],
+                fn=update_quick_controls,
+                inputs=[llm_provider, voice_persona, tts_mode, tts_provider],
+                outputs=self.status_display
+            )
             
             search_btn.click(
                 search_conversations,
                 inputs=search_input,
-                outputs=self.conversation_html
+                outputs=[self.conversation_html, history_limit, load_earlier_btn, conversation_shown]
+            )
+            
+            load_earlier_btn.click(
+                load_earlier_messages,
+                inputs=history_limit,
+                outputs=[self.conversation_html, history_limit, load_earlier_btn]
             )
             
             refresh_btn.click(
-                lambda: self.get_system_status(),
+                self.get_system_status,
                 outputs=self.status_display
             )
             
+            # Status auto-refresh: each session's timer slows down while the status is unchanged
+            status_poll = gr.State(None)
+            status_timer = gr.Timer(STATUS_POLL_MIN)
+            status_timer.tick(
+                self.poll_system_status,
+                inputs=status_poll,
+                outputs=[self.status_display, status_timer, status_poll]
+            )
+            
+            # Conversation refresh: sends the shared snapshot only to sessions that haven't seen it
+            conversation_timer = gr.Timer(CONVERSATION_POLL_INTERVAL)
+            conversation_timer.tick(
+                self.poll_conversation,
+                inputs=[conversation_shown, history_limit],
+                outputs=[self.conversation_html, self.message_count_display, conversation_shown]
+            )
+            
             export_btn.click(
                 export_config,
                 outputs=[config_export, import_status]
@@ -466,14 +657,23 @@ class UnifiedRP500Interface:
             if hasattr(task, 'cancel'):
                 task.cancel()
         
+        # Drop any deferred refreshes
+        with self._throttle_lock:
+            for timer in self._throttle_timers.values():
+                timer.cancel()
+            self._throttle_timers.clear()
+            self._pending_args.clear()
+        
         print("[UnifiedRP500Interface] Background tasks stopped")
     
     def cleanup(self):
         """Clean up resources"""
         print("[UnifiedRP500Interface] Cleaning up...")
         self.stop_background_tasks()
+        self._flush_settings_save()
         self.display_manager.cleanup()
         self.conversation_reader.cleanup()
+        self._update_loop.call_soon_threadsafe(self._update_loop.stop)
         print("[UnifiedRP500Interface] Cleanup complete")
 
 
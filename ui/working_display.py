@@ -1,56 +1,105 @@
 #!/usr/bin/env python3
 
+import sys
 import gradio as gr
 from pathlib import Path
 from PIL import Image
 import random
-import json
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+# Standalone script: make the repo root importable when run as python3 ui/working_display.py
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from system import fast_json
+from ui.resized_images import resized_png_path
 
 # Load client settings
 try:
-    with open('/home/user/RP500-Client/client_settings.json', 'r') as f:
-        client_settings = json.load(f)
+    with open('/home/user/RP500-Client/client_settings.json', 'rb') as f:
+        client_settings = fast_json.loads(f.read())
 except:
     client_settings = {}
 
+_IMAGE_ROOT = Path('/home/user/RP500-Client/images/laura')
+# 300x300 copies of the source PNGs, served to Gradio as files (shared with SimpleUnifiedInterface)
+_RESIZED_DIR = _IMAGE_ROOT / '.cache_300'
+
+# Colored square shown when no image can be loaded, built once and shared
+_FALLBACK_IMAGE = Image.new('RGB', (300, 300), (100, 150, 200))
+
+@lru_cache(maxsize=None)  # Bounded by the small on-disk image set
+def _load_and_resize(path):
+    """Path of a 300x300 copy of a PNG, kept on disk until the source changes"""
+    return resized_png_path(path, _RESIZED_DIR / path.relative_to(_IMAGE_ROOT))
+
 class WorkingDisplay:
+    # States and moods picked from by the test button
+    _TEST_STATES = ('boot', 'listening', 'thinking', 'speaking', 'idle', 'wake')
+    _TEST_MOODS = ('casual', 'excited', 'curious', 'amused', 'thoughtful')
+    
     def __init__(self):
         self.current_state = 'boot'
         self.current_mood = 'casual'
-        self.base_path = Path('/home/user/RP500-Client/images/laura')
+        self._rng = random.Random()  # Own generator, no shared module-level state
+        self.base_path = _IMAGE_ROOT
+        self._image_index = self._build_image_index()
+        self._preload_images()
         self.current_image = self.load_state_image('boot')
     
+    def _build_image_index(self):
+        """Walk the image tree once: (state, mood or None) -> sorted PNG paths"""
+        index = {}
+        if not self.base_path.is_dir():
+            return index
+        for state_dir in self.base_path.iterdir():
+            if not state_dir.is_dir():
+                continue
+            for entry in state_dir.iterdir():
+                if entry.suffix == '.png':
+                    index.setdefault((state_dir.name, None), []).append(entry)
+                elif state_dir.name == 'speaking' and entry.is_dir():
+                    mood_images = sorted(p for p in entry.iterdir() if p.suffix == '.png')
+                    if mood_images:
+                        index[(state_dir.name, entry.name)] = mood_images
+        for paths in index.values():
+            paths.sort()
+        return index
+    
+    def _preload_images(self):
+        """Decode and resize every indexed PNG up front so state changes are cache hits"""
+        paths = sorted({path for paths in self._image_index.values() for path in paths})
+        
+        def preload(path):
+            try:
+                _load_and_resize(path)
+            except Exception as e:
+                print(f"Error preloading image {path}: {e}")
+        
+        # PIL releases the GIL while decoding, so a few threads overlap the work
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            list(executor.map(preload, paths))
+    
     def load_state_image(self, state, mood='casual'):
         """Load an image for the given state"""
         try:
-            state_path = self.base_path / state
-            
             if state == 'speaking' and mood:
-                mood_path = state_path / mood
-                if mood_path.exists():
-                    images = list(mood_path.glob('*.png'))
-                    if images:
-                        return Image.open(random.choice(images)).resize((300, 300))
-            
-            if state_path.exists():
-                images = list(state_path.glob('*.png'))
+                images = self._image_index.get((state, mood))
                 if images:
-                    return Image.open(random.choice(images)).resize((300, 300))
+                    return _load_and_resize(self._rng.choice(images))
+            
+            images = self._image_index.get((state, None))
+            if images:
+                return _load_and_resize(self._rng.choice(images))
             
             # Fallback to boot image
-            boot_path = self.base_path / 'boot'
-            if boot_path.exists():
-                images = list(boot_path.glob('*.png'))
-                if images:
-                    return Image.open(images[0]).resize((300, 300))
+            images = self._image_index.get(('boot', None))
+            if images:
+                return _load_and_resize(images[0])
         
         except Exception as e:
             print(f"Error loading image: {e}")
         
-        # Ultimate fallback - create colored square
-        import numpy as np
-        img_array = np.full((300, 300, 3), (100, 150, 200), dtype=np.uint8)
-        return Image.fromarray(img_array)
+        # Ultimate fallback - colored square
+        return _FALLBACK_IMAGE
     
     def update_state(self, state, mood='casual'):
         """Update current state and return new image"""
@@ -61,11 +110,8 @@ class WorkingDisplay:
     
     def cycle_test_states(self):
         """Cycle through test states"""
-        states = ['boot', 'listening', 'thinking', 'speaking', 'idle', 'wake']
-        moods = ['casual', 'excited', 'curious', 'amused', 'thoughtful']
-        
-        state = random.choice(states)
-        mood = random.choice(moods) if state == 'speaking' else 'casual'
+        state = self._rng.choice(self._TEST_STATES)
+        mood = self._rng.choice(self._TEST_MOODS) if state == 'speaking' else 'casual'
         
         return self.update_state(state, mood)
 
@@ -81,6 +127,7 @@ with gr.Blocks(title="LAURA", css=".container { max-width: 800px; margin: 0 auto
             # Display image
             display_image = gr.Image(
                 value=display.current_image,
+                type="filepath",
                 height=300,
                 width=300,
                 interactive=False,
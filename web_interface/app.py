@@ -1,17 +1,49 @@
 #!/usr/bin/env python3
 
-from flask import Flask, render_template, jsonify, request, send_file
-from flask_socketio import SocketIO, emit
+from flask import Flask, Response, render_template, jsonify, request, send_file
+from flask_socketio import SocketIO, emit, join_room
+import atexit
+import io
 import json
 import os
+import random
+import re
+import tempfile
 import time
 from pathlib import Path
 import threading
 import base64
+import sys
+from contextlib import contextmanager
+
+# Run from web_interface/ (python app.py or gunicorn app:app): make the repo root importable
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from system import fast_json
+
+class _FastJsonCodec:
+    # json-module stand-in for Socket.IO packets, each emit is encoded once with orjson
+    @staticmethod
+    def dumps(obj, **kwargs):
+        try:
+            return fast_json.dumps(obj).decode()
+        except TypeError:
+            return json.dumps(obj, **kwargs)
+
+    @staticmethod
+    def loads(s, **kwargs):
+        return fast_json.loads(s)
+
+def _json(obj):
+    # jsonify, encoded with orjson when available
+    if not fast_json.HAVE_ORJSON:
+        return jsonify(obj)
+    return Response(fast_json.dumps(obj), mimetype='application/json')
 
 app = Flask(__name__)
 app.config['SECRET_KEY'] = 'laura-control-center-2025'
-socketio = SocketIO(app, cors_allowed_origins="*")
+# async_mode is left to auto-detection, which picks eventlet/gevent when installed
+_socketio_options = {'json': _FastJsonCodec} if fast_json.HAVE_ORJSON else {}
+socketio = SocketIO(app, cors_allowed_origins="*", ping_interval=25, ping_timeout=60, **_socketio_options)
 
 # Paths
 BASE_DIR = Path("/home/user/RP500-Client")
@@ -19,63 +51,240 @@ CONFIG_PATH = BASE_DIR / "client_config.json"
 CLAUDE_MD_PATH = BASE_DIR / "CLAUDE.md"
 CURRENT_IMAGE_PATH = BASE_DIR / "current_display.png"
 
+def _blocking_io(fn, *args):
+    # Under eventlet/gevent a plain file read/write/fsync stalls every green thread,
+    # so run it on the async library's OS thread pool; threading mode calls it directly
+    if socketio.async_mode == 'eventlet':
+        from eventlet import tpool
+        return tpool.execute(fn, *args)
+    if socketio.async_mode == 'gevent':
+        import gevent
+        return gevent.get_hub().threadpool.apply(fn, args)
+    return fn(*args)
+
+# Voice IDs: ElevenLabs IDs are 20 alphanumerics, UUID-style IDs add dashes
+_VOICE_ID_RE = re.compile(r'[A-Za-z0-9-]{15,64}')
+
+# Voice settings for new personas, the ElevenLabs voice is filled in per request
+_PERSONA_TEMPLATE = {
+    "elevenlabs": {
+        "model": "eleven_flash_v2_5"
+    },
+    "cartesia": {
+        "voice_id": "78f71eb3-187f-48b4-a763-952f2f4f838a",  # Default
+        "model": "sonic-en"
+    },
+    "piper": {
+        "model_path": "/home/user/RP500-Client/piper_models/en_US-ljspeech-low.onnx",
+        "voice_name": "ljspeech"
+    }
+}
+
+# Parsed config as (file mtime_ns, dict), re-read only when the file changes
+_config_cache = None
+_config_lock = threading.Lock()
+
 # Load initial config
 def load_config():
+    # The returned dict is shared between requests, callers must not mutate it
+    global _config_cache
+    pending = _pending_config
+    if pending is None:
+        pending = _writing_config
+    if pending is not None:
+        return pending  # Queued or being written, the file isn't up to date yet
     try:
-        with open(CONFIG_PATH, 'r') as f:
-            return json.load(f)
-    except:
+        mtime = os.stat(CONFIG_PATH).st_mtime_ns
+    except OSError:
         return {}
+    cached = _config_cache
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+    with _config_lock:
+        # A missing file means no config yet; a malformed one is an error, never
+        # silently treated as empty (a later save would then wipe every persona)
+        try:
+            config = fast_json.loads(_blocking_io(CONFIG_PATH.read_bytes) or b"{}")
+        except FileNotFoundError:
+            return {}
+        _config_cache = (mtime, config)
+        return config
+
+# Config writes are batched: save_config queues the newest config and a background
+# thread writes it CONFIG_FLUSH_DELAY seconds later, so bursts of edits cost one write
+CONFIG_FLUSH_DELAY = 0.2
+_pending_config = None
+_writing_config = None  # Taken off the queue, write in progress
+_pending_lock = threading.Lock()
+_write_lock = threading.Lock()  # One file write at a time, held without _pending_lock
+_config_dirty = threading.Event()
+_flusher_started = False
 
 def save_config(config):
-    with open(CONFIG_PATH, 'w') as f:
-        json.dump(config, f, indent=2)
+    global _pending_config, _flusher_started
+    with _pending_lock:
+        _pending_config = config
+        if not _flusher_started:
+            threading.Thread(target=_config_flusher, daemon=True).start()
+            _flusher_started = True
+    _config_dirty.set()
+
+def _config_flusher():
+    while True:
+        _config_dirty.wait()
+        time.sleep(CONFIG_FLUSH_DELAY)
+        try:
+            flush_config()
+        except Exception as e:
+            print(f"Error saving config: {e}")
+
+def flush_config():
+    # Write the queued config, if any. Only the hand-off happens under _pending_lock,
+    # so save_config never waits for the disk write and fsync
+    global _pending_config, _writing_config, _config_cache
+    with _write_lock:
+        with _pending_lock:
+            _config_dirty.clear()
+            config = _pending_config
+            if config is None:
+                return
+            _pending_config = None
+            _writing_config = config
+        try:
+            _blocking_io(_write_config_atomic, config)
+        except BaseException:
+            with _pending_lock:
+                # Keep it queued for the next save's flush unless a newer config replaced it
+                if _pending_config is None:
+                    _pending_config = config
+            raise
+        finally:
+            with _pending_lock:
+                _writing_config = None
+                _config_cache = None
+
+atexit.register(flush_config)
+
+def _write_config_atomic(config):
+    # Write a sibling temp file and swap it in, readers never see a partial file
+    fd, tmp_path = tempfile.mkstemp(dir=str(CONFIG_PATH.parent), prefix=".client_config.", suffix=".json")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(fast_json.dumps(config, indent=True))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, CONFIG_PATH)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+_txn_lock = threading.Lock()
+
+@contextmanager
+def config_txn():
+    # Read-modify-write of the config under one lock, so concurrent requests
+    # can't overwrite each other's changes; the copy is saved only if it changed
+    with _txn_lock:
+        current = load_config()
+        config = dict(current)
+        yield config
+        if config != current:
+            save_config(config)
 
 @app.route('/')
 def index():
     return render_template('index.html')
 
+def _file_etag(path):
+    # Strong ETag from the file's mtime_ns and size, or None if it can't be stat'ed
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return f"{st.st_mtime_ns:x}-{st.st_size:x}"
+
+def _not_modified():
+    # Clients must revalidate every time rather than reuse a heuristically fresh copy
+    return '', 304, {'Cache-Control': 'no-cache'}
+
+def _revalidated(resp, etag):
+    resp.headers['Cache-Control'] = 'no-cache'
+    if etag is not None:
+        resp.set_etag(etag)
+    return resp
+
 @app.route('/api/config', methods=['GET'])
 def get_config():
-    config = load_config()
-    return jsonify(config)
+    # Queued changes aren't on disk yet, so the file only counts without them
+    etag = _file_etag(CONFIG_PATH) if _pending_config is None and _writing_config is None else None
+    if etag is not None and request.if_none_match.contains(etag):
+        return _not_modified()
+    try:
+        config = load_config()
+    except (ValueError, OSError) as e:
+        return _json({"error": f"Could not read config: {e}"}), 500
+    return _revalidated(_json(config), etag)
 
 @app.route('/api/config', methods=['POST'])
 def update_config():
     data = request.json
-    config = load_config()
-    config.update(data)
-    save_config(config)
-    return jsonify({"status": "success"})
+    try:
+        with config_txn() as config:
+            config.update(data)
+    except (ValueError, OSError) as e:
+        return _json({"error": f"Could not read config: {e}"}), 500
+    return _json({"status": "success"})
 
 @app.route('/api/claude_md', methods=['GET'])
 def get_claude_md():
     try:
-        with open(CLAUDE_MD_PATH, 'r') as f:
-            content = f.read()
-        return jsonify({"content": content})
+        etag = _file_etag(CLAUDE_MD_PATH)
+        if etag is not None and request.if_none_match.contains(etag):
+            return _not_modified()
+        content = _blocking_io(CLAUDE_MD_PATH.read_text, 'utf-8')
+        return _revalidated(_json({"content": content}), etag)
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
+        return _json({"error": str(e)}), 500
+
+@app.route('/api/claude_md/raw', methods=['GET'])
+def get_claude_md_raw():
+    # Sent as-is (sendfile where the server supports it) with ETag/304 handling
+    if not CLAUDE_MD_PATH.is_file():
+        return _json({"error": "CLAUDE.md not found"}), 404
+    return send_file(CLAUDE_MD_PATH, mimetype='text/markdown', conditional=True)
+
+def _write_claude_md(content):
+    with open(CLAUDE_MD_PATH, 'w', buffering=131072, encoding='utf-8') as f:
+        f.write(content)
 
 @app.route('/api/claude_md', methods=['POST'])
 def update_claude_md():
     try:
         data = request.json
         content = data.get('content', '')
-        with open(CLAUDE_MD_PATH, 'w') as f:
-            f.write(content)
-        return jsonify({"status": "success"})
+        _blocking_io(_write_claude_md, content)
+        return _json({"status": "success"})
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
+        return _json({"error": str(e)}), 500
+
+_personas_body = None
 
 @app.route('/api/personas', methods=['GET'])
 def get_personas():
+    # Encoded body is kept as (config dict, bytes); loaded configs are never mutated,
+    # so the same dict object means the same personas
+    global _personas_body
     try:
         config = load_config()
-        personas = config.get('persona_voice_configs', {})
-        return jsonify({"personas": personas})
+        cached = _personas_body
+        if cached is None or cached[0] is not config:
+            personas = config.get('persona_voice_configs', {})
+            cached = (config, _json({"personas": personas}).get_data())
+            _personas_body = cached
+        return Response(cached[1], mimetype='application/json')
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
+        return _json({"error": str(e)}), 500
 
 @app.route('/api/personas', methods=['POST'])
 def add_persona():
@@ -87,111 +296,180 @@ def add_persona():
         
         # Validate inputs
         if not persona_name or not voice_id:
-            return jsonify({"error": "Persona name and voice ID are required"}), 400
+            return _json({"error": "Persona name and voice ID are required"}), 400
         
         # Validate voice ID format (ElevenLabs voice IDs are typically 20 characters)
-        if len(voice_id) < 15 or not voice_id.replace('-', '').isalnum():
-            return jsonify({"error": "Invalid voice ID format"}), 400
-        
-        # Load current config
-        config = load_config()
-        personas = config.get('persona_voice_configs', {})
-        
-        # Check for duplicates
-        if persona_name in personas:
-            return jsonify({"error": f"Persona '{persona_name}' already exists"}), 400
+        if not _VOICE_ID_RE.fullmatch(voice_id):
+            return _json({"error": "Invalid voice ID format"}), 400
         
         # Create new persona config
-        new_persona = {
-            "elevenlabs": {
-                "voice_name_or_id": voice_id,
-                "model": "eleven_flash_v2_5"
-            },
-            "cartesia": {
-                "voice_id": "78f71eb3-187f-48b4-a763-952f2f4f838a",  # Default
-                "model": "sonic-en"
-            },
-            "piper": {
-                "model_path": "/home/user/RP500-Client/piper_models/en_US-ljspeech-low.onnx",
-                "voice_name": "ljspeech"
-            }
-        }
+        new_persona = {k: v.copy() for k, v in _PERSONA_TEMPLATE.items()}
+        new_persona["elevenlabs"]["voice_name_or_id"] = voice_id
         
         # Add display name if provided
         if voice_name:
             new_persona["display_name"] = voice_name
         
-        # Add to config
-        personas[persona_name] = new_persona
-        config['persona_voice_configs'] = personas
-        
-        # Save updated config
-        save_config(config)
+        with config_txn() as config:
+            personas = config.get('persona_voice_configs', {})
+            
+            # Check for duplicates
+            if persona_name in personas:
+                return _json({"error": f"Persona '{persona_name}' already exists"}), 400
+            
+            # Add to config (new personas dict, the loaded one is shared)
+            config['persona_voice_configs'] = {**personas, persona_name: new_persona}
         
-        return jsonify({"status": "success", "persona": persona_name})
+        return _json({"status": "success", "persona": persona_name})
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
+        return _json({"error": str(e)}), 500
 
 @app.route('/api/personas/<persona_name>', methods=['DELETE'])
 def delete_persona(persona_name):
     try:
         # Prevent deleting essential personas
         if persona_name.lower() in ['laura', 'client_default']:
-            return jsonify({"error": "Cannot delete essential personas"}), 400
-        
-        config = load_config()
-        personas = config.get('persona_voice_configs', {})
-        
-        if persona_name not in personas:
-            return jsonify({"error": f"Persona '{persona_name}' not found"}), 404
+            return _json({"error": "Cannot delete essential personas"}), 400
         
-        # Remove persona
-        del personas[persona_name]
-        config['persona_voice_configs'] = personas
+        with config_txn() as config:
+            personas = config.get('persona_voice_configs', {})
+            
+            if persona_name not in personas:
+                return _json({"error": f"Persona '{persona_name}' not found"}), 404
+            
+            # Remove persona (new personas dict, the loaded one is shared)
+            config['persona_voice_configs'] = {name: cfg for name, cfg in personas.items() if name != persona_name}
         
-        # Save updated config
-        save_config(config)
-        
-        return jsonify({"status": "success"})
+        return _json({"status": "success"})
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
+        return _json({"error": str(e)}), 500
 
-@app.route('/api/current_image')
-def get_current_image():
-    import random
-    
-    # Pick a random image from idle folder
-    idle_folder = BASE_DIR / "images" / "laura" / "idle"
-    if idle_folder.exists():
-        images = list(idle_folder.glob("*.png"))
-        if images:
-            random_image = random.choice(images)
-            return send_file(random_image, mimetype='image/png')
-    
-    # Generate a simple placeholder if no images found
-    import io
-    from PIL import Image, ImageDraw, ImageFont
+def _render_placeholder():
+    # Simple "LAURA" text placeholder, rendered once at import
+    try:
+        from PIL import Image, ImageDraw
+    except ImportError:
+        return None
     
     img = Image.new('RGB', (200, 200), color='#1a1a1a')
     draw = ImageDraw.Draw(img)
-    # Simple text placeholder
     draw.text((50, 90), "LAURA", fill='#666666')
     
     img_io = io.BytesIO()
     img.save(img_io, 'PNG')
-    img_io.seek(0)
+    return img_io.getvalue()
+
+_PLACEHOLDER_PNG = _render_placeholder()
+
+# Idle image listing as (directory mtime_ns, [path strings]), rescanned only when the folder changes
+IDLE_FOLDER = BASE_DIR / "images" / "laura" / "idle"
+_idle_cache = None
+
+# When running behind nginx, set this to an internal location aliased to IDLE_FOLDER
+# (e.g. "location /protected_images/ { internal; alias .../idle/; }") so nginx
+# sends the image bytes and Python only picks the file
+IDLE_ACCEL_PREFIX = os.environ.get('LAURA_IDLE_ACCEL_PREFIX')
+
+def _list_idle_images():
+    global _idle_cache
+    try:
+        mtime = os.stat(IDLE_FOLDER).st_mtime_ns
+    except OSError:
+        return []
+    cached = _idle_cache
+    if cached is None or cached[0] != mtime:
+        with os.scandir(IDLE_FOLDER) as entries:
+            cached = (mtime, sorted(e.path for e in entries if e.name.endswith('.png')))
+        _idle_cache = cached
+    return cached[1]
+
+@app.route('/api/current_image')
+def get_current_image():
+    # Pick a random image from idle folder
+    images = _list_idle_images()
+    if images:
+        random_image = images[random.randrange(len(images))]
+        # No ETag/304 here: the client cache-busts every refresh to get a new random pick
+        if IDLE_ACCEL_PREFIX:
+            resp = Response(mimetype='image/png')
+            resp.headers['X-Accel-Redirect'] = IDLE_ACCEL_PREFIX.rstrip('/') + '/' + os.path.basename(random_image)
+            return resp
+        return send_file(random_image, mimetype='image/png', etag=False)
     
-    return send_file(img_io, mimetype='image/png')
+    # Serve the pre-rendered placeholder if no images found
+    if _PLACEHOLDER_PNG is None:
+        return _json({"error": "No display image available"}), 404
+    return Response(_PLACEHOLDER_PNG, mimetype='image/png')
 
 @socketio.on('connect')
 def handle_connect():
     print('Client connected')
     emit('connected', {'data': 'Connected to LAURA Control Center'})
 
+# Status updates are merged per topic (last write wins per key) and sent at most
+# once per STATUS_FLUSH_INTERVAL to the topic's room, so a burst of updates costs a
+# single emit and only subscribed clients receive it
+STATUS_FLUSH_INTERVAL = 1 / 30
+DEFAULT_STATUS_TOPIC = 'default'
+_status = {}  # topic -> merged status
+_last_status = {}  # topic -> what subscribers have been sent, updates carry only the keys that differ
+_dirty_topics = set()  # Topics updated since the last flush
+_status_lock = threading.Lock()
+# Created by the server so waiting on it yields under eventlet/gevent instead of blocking
+_status_dirty = socketio.server.eio.create_event()
+_status_flusher_started = False
+
+@socketio.on('subscribe')
+def handle_subscribe(data=None):
+    topic = (data or {}).get('topic', DEFAULT_STATUS_TOPIC)
+    join_room(topic)
+    # Broadcasts are deltas, so a new subscriber starts from the full status
+    with _status_lock:
+        current = _last_status.get(topic, {}).copy()
+    if current:
+        emit('status_changed', current)
+
 @socketio.on('update_status')
 def handle_status_update(data):
-    # Broadcast status updates to all connected clients
-    emit('status_changed', data, broadcast=True)
+    # Queue the update for the next broadcast to the topic's subscribers
+    global _status_flusher_started
+    topic = data.get('topic', DEFAULT_STATUS_TOPIC)
+    with _status_lock:
+        _status.setdefault(topic, {}).update((k, v) for k, v in data.items() if k != 'topic')
+        _dirty_topics.add(topic)
+        if not _status_flusher_started:
+            socketio.start_background_task(_status_flusher)
+            _status_flusher_started = True
+    _status_dirty.set()
+
+def _status_flusher():
+    # Idle until an update arrives, then flush no more often than STATUS_FLUSH_INTERVAL
+    last_flush = 0.0
+    while True:
+        _status_dirty.wait()
+        wait = last_flush + STATUS_FLUSH_INTERVAL - time.monotonic()
+        if wait > 0:
+            socketio.sleep(wait)
+        last_flush = time.monotonic()
+        with _status_lock:
+            _status_dirty.clear()
+            diffs = []
+            for topic in _dirty_topics:
+                status = _status[topic]
+                sent = _last_status.setdefault(topic, {})
+                diff = {k: v for k, v in status.items() if k not in sent or sent[k] != v}
+                if diff:
+                    sent.update(diff)
+                    diffs.append((topic, diff))
+            _dirty_topics.clear()
+        for topic, diff in diffs:
+            try:
+                socketio.emit('status_changed', diff, to=topic)
+            except Exception as e:
+                print(f"Error broadcasting status: {e}")
 
 if __name__ == '__main__':
-    socketio.run(app, host='0.0.0.0', port=7860, debug=True)
\ No newline at end of file
+    # Local/dev server; scripts/start_web_interface.sh runs gunicorn when available
+    # Debug mode (and its reloader process) only when asked for
+    debug = os.environ.get('LAURA_WEB_DEBUG', '').lower() in ('1', 'true', 'yes')
+    socketio.run(app, host='0.0.0.0', port=7860, debug=debug)
\ No newline at end of file
@@ -44,6 +44,8 @@ document.addEventListener('DOMContentLoaded', function() {
 socket.on('connect', function() {
     console.log('Connected to server');
     updateStatus('Connected', 'success');
+    // Rooms don't survive a reconnect, so (re)subscribe on every connect
+    socket.emit('subscribe', { topic: 'default' });
 });
 
 socket.on('disconnect', function() {
@@ -52,7 +54,8 @@ socket.on('disconnect', function() {
 });
 
 socket.on('status_changed', function(data) {
-    // Update status display when server sends updates
+    // Update status display when server sends updates. After the full status
+    // sent on subscribe, updates only carry the keys that changed
     if (data.status) {
         document.getElementById('system-status').textContent = data.status;
     }
@@ -70,10 +73,14 @@ socket.on('status_changed', function(data) {
 // Load CLAUDE.md content
 async function loadClaudeMd() {
     try {
-        const response = await fetch('/api/claude_md');
-        const data = await response.json();
-        if (data.content) {
-            editor.setValue(data.content);
+        // Raw file endpoint: no JSON wrapping, revalidated with its ETag
+        const response = await fetch('/api/claude_md/raw', { cache: 'no-cache' });
+        if (!response.ok) {
+            throw new Error('Load failed');
+        }
+        const content = await response.text();
+        if (content) {
+            editor.setValue(content);
             showNotification('CLAUDE.md loaded successfully', 'success');
         }
     } catch (error) {